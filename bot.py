@@ -4,11 +4,19 @@ Main bot module with message handling and commands
 Author: Sami (CodeNob Dev)
 """
 
+import asyncio
+import weakref
 import discord
 from discord.ext import commands
-from typing import Dict, List
+from typing import Set
 
 from config import config
+from utils.context_store import (
+    ContextStore,
+    MemoryContextStore,
+    RedisContextStore,
+    SQLiteContextStore,
+)
 from utils.openai_client import OpenAIClient
 from utils.rate_limiter import RateLimiter
 from utils.validators import InputValidator
@@ -30,8 +38,39 @@ openai_client = OpenAIClient(
 rate_limiter = RateLimiter()
 validator = InputValidator()
 
-# Store conversation context per user
-user_contexts: Dict[int, List[Dict[str, str]]] = {}
+# Maximum messages kept per user (user + assistant per exchange)
+MAX_CONTEXT_MESSAGES = config.max_context_length * 2
+
+# Store conversation context per user (backend chosen by CONTEXT_STORE)
+user_contexts: ContextStore
+if config.context_store == "redis":
+    user_contexts = RedisContextStore(
+        config.redis_url,
+        max_messages=MAX_CONTEXT_MESSAGES,
+        ttl=config.context_ttl_seconds,
+    )
+elif config.context_store == "sqlite":
+    user_contexts = SQLiteContextStore(
+        config.db_path,
+        max_messages=MAX_CONTEXT_MESSAGES,
+        ttl=config.context_ttl_seconds,
+    )
+else:
+    user_contexts = MemoryContextStore(
+        max_messages=MAX_CONTEXT_MESSAGES,
+        ttl=config.context_ttl_seconds,
+        max_users=config.max_cached_users,
+    )
+
+# Limit in-flight AI requests and keep each user's messages in order.
+# A user's lock is dropped automatically once no handler references it.
+request_semaphore = asyncio.Semaphore(config.max_concurrent_requests)
+user_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = (
+    weakref.WeakValueDictionary()
+)
+
+# Keep references to running handler tasks so they are not garbage collected
+pending_tasks: Set[asyncio.Task] = set()
 
 
 @bot.event
@@ -66,163 +105,83 @@ async def on_message(message: discord.Message) -> None:
         )
         return
 
-    # Validate message
-    is_valid, cleaned_text, error = validator.validate_message(message.content)
-    if not is_valid:
-        await message.channel.send(f"Error: {error}")
-        return
+    # Handle message in background so other messages are not blocked
+    task = asyncio.create_task(handle_message(message))
+    pending_tasks.add(task)
+    task.add_done_callback(pending_tasks.discard)
 
-    # Get or create user context
-    user_id = message.author.id
-    if user_id not in user_contexts:
-        user_contexts[user_id] = []
-
-    # Add user message to context
-    user_contexts[user_id].append({"role": "user", "content": cleaned_text})
-
-    # Keep only last N messages
-    max_messages = config.max_context_length * 2
-    if len(user_contexts[user_id]) > max_messages:
-        user_contexts[user_id] = user_contexts[user_id][-max_messages:]
-
-    # Show typing indicator
-    async with message.channel.typing():
-        # Get AI response (synchronous call, returns tuple)
-        success, response_text, error_message = openai_client.get_chat_response(
-            user_contexts[user_id]
-        )
 
-        # Check if request succeeded
-        if not success:
-            await message.channel.send(f"Error: {error_message}")
-            return
-
-    # Add AI response to context
-    user_contexts[user_id].append({"role": "assistant", "content": response_text})
-
-    # Send response
-    await message.channel.send(response_text)
-
-
-@bot.command(name="ping")
-async def ping(ctx: commands.Context) -> None:
+async def handle_message(message: discord.Message) -> None:
     """
-    Test command to check if bot is responding
+    Generate and send AI reply for a message
 
-    Args:
-        ctx: Command context
-    """
-    await ctx.send("Pong!")
-
-
-@bot.command(name="clear")
-async def clear_context(ctx: commands.Context) -> None:
-    """
-    Clear user's conversation context
+    Runs concurrently with other handlers, limited by request_semaphore.
+    Messages from the same user are processed one at a time.
 
     Args:
-        ctx: Command context
+        message: Discord message object
     """
-    user_id = ctx.author.id
-    if user_id in user_contexts:
-        user_contexts[user_id] = []
-    await ctx.send("Conversation context cleared!")
-
+    user_lock = get_user_lock(message.author.id)
 
-if __name__ == "__main__":
-    bot.run(config.discord_token)
-"""
-Discord OpenAI Bot
-Main bot module with message handling and commands
-Author: Sami (CodeNob Dev)
-"""
+    try:
+        async with user_lock, request_semaphore:
+            await respond_to_message(message)
+    except Exception:
+        # Report like any other event handler error instead of losing it
+        await bot.on_error("message", message)
 
-import discord
-from discord.ext import commands
-from typing import Dict, List
 
-from config import config
-from utils.openai_client import OpenAIClient
-from utils.rate_limiter import RateLimiter
-from utils.validators import Validator
-
-# Create bot with intents
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
-
-bot = commands.Bot(command_prefix="!", intents=intents)
-
-# Initialize utilities
-openai_client = OpenAIClient()
-rate_limiter = RateLimiter()
-validator = Validator()
-
-# Store conversation context per user
-user_contexts: Dict[int, List[Dict[str, str]]] = {}
+def get_user_lock(user_id: int) -> asyncio.Lock:
+    """
+    Get the lock serializing a user's context updates
 
+    Args:
+        user_id: Discord user ID
 
-@bot.event
-async def on_ready() -> None:
-    """Called when bot is ready and connected to Discord"""
-    print(f"{bot.user} has connected to Discord!")
-    print(f"Bot is in {len(bot.guilds)} servers")
+    Returns:
+        Lock shared by all in-flight handlers for this user
+    """
+    user_lock = user_locks.get(user_id)
+    if user_lock is None:
+        user_lock = user_locks[user_id] = asyncio.Lock()
+    return user_lock
 
 
-@bot.event
-async def on_message(message: discord.Message) -> None:
+async def respond_to_message(message: discord.Message) -> None:
     """
-    Handle incoming messages
+    Validate message, query OpenAI and send the reply
 
     Args:
         message: Discord message object
     """
-    # Ignore own messages
-    if message.author == bot.user:
-        return
-
-    # Ignore if message starts with command prefix
-    if message.content.startswith("!"):
-        await bot.process_commands(message)
-        return
-
-    # Check rate limit
-    if not rate_limiter.is_allowed(message.author.id):
-        wait_time = rate_limiter.get_wait_time(message.author.id)
-        await message.channel.send(
-            f"Please wait {wait_time} seconds before sending another message."
-        )
-        return
-
     # Validate message
-    is_valid, error = validator.validate_message(message.content)
+    is_valid, cleaned_text, error = validator.validate_message(message.content)
     if not is_valid:
         await message.channel.send(f"Error: {error}")
         return
 
-    # Get or create user context
+    # Add user message to context (store keeps only last N messages)
     user_id = message.author.id
-    if user_id not in user_contexts:
-        user_contexts[user_id] = []
-
-    # Add user message to context
-    user_contexts[user_id].append({"role": "user", "content": message.content})
-
-    # Keep only last N messages
-    max_messages = config.max_context_length * 2
-    if len(user_contexts[user_id]) > max_messages:
-        user_contexts[user_id] = user_contexts[user_id][-max_messages:]
+    await user_contexts.append(user_id, {"role": "user", "content": cleaned_text})
+    context = await user_contexts.get(user_id)
 
     # Show typing indicator
     async with message.channel.typing():
-        # Get AI response
-        response = await openai_client.get_response(user_contexts[user_id])
+        # Get AI response (awaited so other messages keep being processed)
+        success, response_text, error_message = await openai_client.get_chat_response(
+            context, validate_last_only=True
+        )
+
+        # Check if request succeeded
+        if not success:
+            await message.channel.send(f"Error: {error_message}")
+            return
 
     # Add AI response to context
-    user_contexts[user_id].append({"role": "assistant", "content": response})
+    await user_contexts.append(user_id, {"role": "assistant", "content": response_text})
 
     # Send response
-    await message.channel.send(response)
+    await message.channel.send(response_text)
 
 
 @bot.command(name="ping")
@@ -244,32 +203,11 @@ async def clear_context(ctx: commands.Context) -> None:
     Args:
         ctx: Command context
     """
-    user_id = ctx.author.id
-    if user_id in user_contexts:
-        user_contexts[user_id] = []
+    # Wait for any in-flight reply so it can't re-create the context
+    async with get_user_lock(ctx.author.id):
+        await user_contexts.clear(ctx.author.id)
     await ctx.send("Conversation context cleared!")
 
 
-@bot.command(name="help")
-async def help_command(ctx: commands.Context) -> None:
-    """
-    Show help message with available commands
-
-    Args:
-        ctx: Command context
-    """
-    help_text = """
-**Discord Bot Commands:**
-
-Chat: Send a message to talk with AI
-!ping - Test bot response
-!clear - Clear conversation history
-!help - Show this help message
-
-Rate limit: One message every 3 seconds
-    """
-    await ctx.send(help_text)
-
-
 if __name__ == "__main__":
     bot.run(config.discord_token)
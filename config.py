@@ -39,6 +39,17 @@ class BotConfig:
         # Message configuration
         self.max_context_length = int(os.getenv("MAX_CONTEXT_LENGTH", "10"))
         self.max_message_length = int(os.getenv("MAX_MESSAGE_LENGTH", "2000"))
+        self.max_cached_users = int(os.getenv("MAX_CACHED_USERS", "1000"))
+        self.context_ttl_seconds = int(os.getenv("CONTEXT_TTL_SECONDS", "3600"))
+
+        # Context storage configuration (memory, sqlite or redis)
+        self.context_store = os.getenv("CONTEXT_STORE", "memory").lower()
+        if self.context_store not in ("memory", "sqlite", "redis"):
+            raise ValueError("CONTEXT_STORE must be one of: memory, sqlite, redis")
+        self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+        # Concurrency configuration
+        self.max_concurrent_requests = int(os.getenv("MAX_CONCURRENT_REQUESTS", "8"))
 
         # Database configuration
         self.db_path = os.getenv("DB_PATH", "discord_bot.db")
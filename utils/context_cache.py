@@ -0,0 +1,142 @@
+"""
+Conversation context cache for Discord bot
+Keeps recent user contexts in memory with LRU eviction and TTL expiry
+Author: Sami (CodeNob Dev)
+"""
+
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+
+class ContextCache:
+    """
+    Bounded in-memory store for per-user conversation context
+
+    Entries are kept in least-recently-used order, so the oldest entry
+    is always at the front and can be evicted or expired in O(1).
+
+    Features:
+    - Maximum number of cached users (LRU eviction)
+    - Expiry of contexts idle longer than ttl seconds
+    - Access refreshes both LRU position and expiry
+
+    Security:
+    - Bounded memory regardless of how many users message the bot
+    - Per-user isolation
+    """
+
+    def __init__(self, max_users: int = 1000, ttl: int = 3600):
+        """
+        Initialize context cache
+
+        Args:
+            max_users: Maximum number of users kept in memory (default: 1000)
+            ttl: Seconds before an idle context expires (default: 3600 = 1 hour)
+        """
+        self.max_users = max_users
+        self.ttl = ttl
+
+        # Key: user_id, Value: (last access timestamp, context messages)
+        self._entries: "OrderedDict[int, Tuple[float, Deque[Dict[str, str]]]]" = (
+            OrderedDict()
+        )
+
+    def get(self, user_id: int) -> Optional[Deque[Dict[str, str]]]:
+        """
+        Get user's context and mark it as recently used
+
+        Args:
+            user_id: Discord user ID
+
+        Returns:
+            Context messages, or None if missing or expired
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+
+        current_time = time.monotonic()
+        last_access, context = entry
+
+        if current_time - last_access > self.ttl:
+            del self._entries[user_id]
+            return None
+
+        self._entries[user_id] = (current_time, context)
+        self._entries.move_to_end(user_id)
+        return context
+
+    def set(self, user_id: int, context: Deque[Dict[str, str]]):
+        """
+        Store user's context and evict stale or overflowing entries
+
+        Args:
+            user_id: Discord user ID
+            context: Context messages to store
+        """
+        current_time = time.monotonic()
+
+        self._entries[user_id] = (current_time, context)
+        self._entries.move_to_end(user_id)
+
+        self._evict(current_time)
+
+    def pop(self, user_id: int):
+        """
+        Remove user's context
+
+        Args:
+            user_id: Discord user ID
+        """
+        self._entries.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, current_time: float):
+        """
+        Drop least recently used entries that are expired or over capacity
+
+        Args:
+            current_time: Current monotonic timestamp
+        """
+        while self._entries:
+            oldest_user, (last_access, _) = next(iter(self._entries.items()))
+
+            if (
+                len(self._entries) <= self.max_users
+                and current_time - last_access <= self.ttl
+            ):
+                break
+
+            del self._entries[oldest_user]
+
+
+# Test the context cache when running this file directly
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 TESTING CONTEXT CACHE")
+    print("=" * 60)
+
+    cache = ContextCache(max_users=2, ttl=60)
+
+    print("\nTest 1: Store and read context")
+    cache.set(1, deque([{"role": "user", "content": "Hello!"}]))
+    print(f"  User 1 context: {cache.get(1)}")
+
+    print("\nTest 2: LRU eviction (max 2 users)")
+    cache.set(2, deque([{"role": "user", "content": "Hi"}]))
+    cache.get(1)  # User 1 is now most recently used
+    cache.set(3, deque([{"role": "user", "content": "Hey"}]))
+    print(f"  User 2 evicted: {cache.get(2) is None} (should be True)")
+    print(f"  User 1 kept: {cache.get(1) is not None} (should be True)")
+
+    print("\nTest 3: TTL expiry")
+    cache.ttl = 0
+    time.sleep(0.01)
+    print(f"  User 3 expired: {cache.get(3) is None} (should be True)")
+
+    print("\n" + "=" * 60)
+    print("✅ ALL CONTEXT CACHE TESTS COMPLETE")
+    print("=" * 60)
@@ -0,0 +1,299 @@
+"""
+Conversation context storage backends for Discord bot
+Keeps per-user chat history in memory, SQLite or Redis
+Author: Sami (CodeNob Dev)
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, List, Sequence
+
+from utils.context_cache import ContextCache
+
+
+class ContextStore(ABC):
+    """
+    Interface for per-user conversation context storage
+
+    Every backend keeps at most max_messages per user and forgets
+    contexts that have been idle for longer than ttl seconds.
+    """
+
+    def __init__(self, max_messages: int = 20, ttl: int = 3600):
+        """
+        Initialize context store
+
+        Args:
+            max_messages: Maximum messages kept per user (default: 20)
+            ttl: Seconds before an idle context expires (default: 3600 = 1 hour)
+        """
+        self.max_messages = max_messages
+        self.ttl = ttl
+
+    @abstractmethod
+    async def get(self, user_id: int) -> Sequence[Dict[str, str]]:
+        """
+        Get user's context, oldest message first
+
+        Args:
+            user_id: Discord user ID
+
+        Returns:
+            Context messages (empty if none stored)
+        """
+
+    @abstractmethod
+    async def append(self, user_id: int, message: Dict[str, str]):
+        """
+        Add a message to user's context, dropping the oldest over the limit
+
+        Args:
+            user_id: Discord user ID
+            message: Message dict {"role": "...", "content": "..."}
+        """
+
+    @abstractmethod
+    async def clear(self, user_id: int):
+        """
+        Remove user's context
+
+        Args:
+            user_id: Discord user ID
+        """
+
+
+class MemoryContextStore(ContextStore):
+    """
+    In-process context store (single bot process, lost on restart)
+
+    Contexts are fixed-size deques kept in a bounded LRU ContextCache.
+    """
+
+    def __init__(self, max_messages: int = 20, ttl: int = 3600, max_users: int = 1000):
+        """
+        Initialize in-memory context store
+
+        Args:
+            max_messages: Maximum messages kept per user (default: 20)
+            ttl: Seconds before an idle context expires (default: 3600 = 1 hour)
+            max_users: Maximum number of users kept in memory (default: 1000)
+        """
+        super().__init__(max_messages, ttl)
+        self._cache = ContextCache(max_users=max_users, ttl=ttl)
+
+    async def get(self, user_id: int) -> Sequence[Dict[str, str]]:
+        # Returned deque is the live context, no copy is made
+        return self._cache.get(user_id) or ()
+
+    async def append(self, user_id: int, message: Dict[str, str]):
+        context = self._cache.get(user_id)
+        if context is None:
+            # Older messages drop off automatically
+            context = deque(maxlen=self.max_messages)
+            self._cache.set(user_id, context)
+
+        context.append(message)
+
+    async def clear(self, user_id: int):
+        self._cache.pop(user_id)
+
+
+class SQLiteContextStore(ContextStore):
+    """
+    SQLite-backed context store (persists across restarts)
+
+    Uses WAL mode so several bot processes on one host can share the
+    database file. Queries run in a worker thread so waiting on disk or
+    on another process's write lock never blocks the event loop.
+    """
+
+    def __init__(self, db_path: str, max_messages: int = 20, ttl: int = 3600):
+        """
+        Initialize SQLite context store
+
+        Args:
+            db_path: Path to SQLite database file
+            max_messages: Maximum messages kept per user (default: 20)
+            ttl: Seconds before an idle context expires (default: 3600 = 1 hour)
+        """
+        super().__init__(max_messages, ttl)
+
+        # Connection is shared by worker threads, one query at a time
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS context_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_context_messages_user "
+            "ON context_messages (user_id, id)"
+        )
+
+        # Drop contexts that expired while the bot was offline
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM context_messages WHERE user_id IN ("
+                "SELECT user_id FROM context_messages "
+                "GROUP BY user_id HAVING MAX(created_at) < ?)",
+                (time.time() - self.ttl,),
+            )
+
+    async def get(self, user_id: int) -> Sequence[Dict[str, str]]:
+        return await asyncio.to_thread(self._get_sync, user_id)
+
+    async def append(self, user_id: int, message: Dict[str, str]):
+        await asyncio.to_thread(self._append_sync, user_id, message)
+
+    async def clear(self, user_id: int):
+        await asyncio.to_thread(self._clear_sync, user_id)
+
+    def _get_sync(self, user_id: int) -> List[Dict[str, str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content, created_at FROM context_messages "
+                "WHERE user_id = ? ORDER BY id",
+                (user_id,),
+            ).fetchall()
+
+            # Context expires when its newest message is older than ttl
+            if rows and time.time() - rows[-1][2] > self.ttl:
+                with self._conn:
+                    self._conn.execute(
+                        "DELETE FROM context_messages WHERE user_id = ?", (user_id,)
+                    )
+                return []
+
+        return [{"role": role, "content": content} for role, content, _ in rows]
+
+    def _append_sync(self, user_id: int, message: Dict[str, str]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO context_messages (user_id, role, content, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (user_id, message["role"], message["content"], time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM context_messages WHERE user_id = ? AND id NOT IN ("
+                "SELECT id FROM context_messages WHERE user_id = ? "
+                "ORDER BY id DESC LIMIT ?)",
+                (user_id, user_id, self.max_messages),
+            )
+
+    def _clear_sync(self, user_id: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM context_messages WHERE user_id = ?", (user_id,)
+            )
+
+
+class RedisContextStore(ContextStore):
+    """
+    Redis-backed context store (shared by sharded bot processes)
+
+    Each context is a Redis list of JSON messages. RPUSH, LTRIM and
+    EXPIRE run in one round trip, giving both the size cap and TTL.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        max_messages: int = 20,
+        ttl: int = 3600,
+        key_prefix: str = "discord_bot:context",
+    ):
+        """
+        Initialize Redis context store
+
+        Args:
+            redis_url: Redis connection URL (redis://host:port/db)
+            max_messages: Maximum messages kept per user (default: 20)
+            ttl: Seconds before an idle context expires (default: 3600 = 1 hour)
+            key_prefix: Prefix for per-user list keys
+        """
+        # Imported here so redis is only required when this backend is used
+        import redis.asyncio as redis
+
+        super().__init__(max_messages, ttl)
+        self.key_prefix = key_prefix
+        self._redis = redis.from_url(redis_url)
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.key_prefix}:{user_id}"
+
+    async def get(self, user_id: int) -> Sequence[Dict[str, str]]:
+        items: List[bytes] = await self._redis.lrange(self._key(user_id), 0, -1)
+        return [json.loads(item) for item in items]
+
+    async def append(self, user_id: int, message: Dict[str, str]):
+        key = self._key(user_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, json.dumps(message))
+            pipe.ltrim(key, -self.max_messages, -1)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def clear(self, user_id: int):
+        await self._redis.delete(self._key(user_id))
+
+
+# Test the context stores when running this file directly
+if __name__ == "__main__":
+
+    async def run_store_tests(name: str, make_store):
+        print(f"\n📋 {name}:\n")
+
+        store = make_store(3, 60)
+        test_user = 123456
+
+        # Test 1: Trimming to max_messages
+        for i in range(5):
+            await store.append(test_user, {"role": "user", "content": f"Message {i}"})
+        context = await store.get(test_user)
+        print(f"  Messages after adding 5: {len(context)} (should be 3)")
+        print(f"  Oldest message: '{context[0]['content']}' (should be 'Message 2')")
+
+        # Test 2: Unknown user
+        print(f"  Unknown user empty: {len(await store.get(789012)) == 0}")
+
+        # Test 3: Clear
+        await store.clear(test_user)
+        print(f"  Empty after clear: {len(await store.get(test_user)) == 0}")
+
+        # Test 4: TTL expiry
+        store = make_store(3, 0)
+        await store.append(test_user, {"role": "user", "content": "Hello!"})
+        await asyncio.sleep(0.01)
+        print(f"  Expired after ttl: {len(await store.get(test_user)) == 0}")
+
+    async def main():
+        print("=" * 60)
+        print("🧪 TESTING CONTEXT STORES")
+        print("=" * 60)
+
+        await run_store_tests(
+            "Memory store",
+            lambda max_messages, ttl: MemoryContextStore(max_messages, ttl),
+        )
+        await run_store_tests(
+            "SQLite store (:memory:)",
+            lambda max_messages, ttl: SQLiteContextStore(":memory:", max_messages, ttl),
+        )
+
+        print("\n" + "=" * 60)
+        print("✅ ALL CONTEXT STORE TESTS COMPLETE")
+        print("=" * 60)
+
+    asyncio.run(main())
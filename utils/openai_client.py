@@ -4,14 +4,17 @@ Provides safe interface to OpenAI GPT models with error handling
 Author: Sami (CodeNob Dev)
 """
 
+import asyncio
+import httpx
 import openai
-from typing import List, Dict, Optional, Tuple
-import time
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from collections.abc import Sequence as SequenceABC
+from typing import Dict, Optional, Sequence, Tuple
 
 
 class OpenAIClient:
     """
-    Safe wrapper for OpenAI API calls in Discord bot (v0.28.1 API)
+    Safe wrapper for OpenAI API calls in Discord bot (async v1 API)
 
     Features:
     - Automatic error handling
@@ -27,6 +30,9 @@ class OpenAIClient:
     - No sensitive data in logs
     """
 
+    # Roles accepted by the chat completions API
+    VALID_ROLES = {"system", "user", "assistant"}
+
     def __init__(
         self,
         api_key: str,
@@ -50,8 +56,16 @@ class OpenAIClient:
         if not api_key or not api_key.startswith("sk-"):
             raise ValueError("Invalid OpenAI API key format")
 
-        # Set API key globally for openai library (v0.28.1 style)
-        openai.api_key = api_key
+        # Create async client once and reuse it for every request.
+        # Pooled keep-alive HTTP/2 connections avoid a TLS handshake per call.
+        # SDK retries are disabled because retries are handled below.
+        http_client = DefaultAsyncHttpxClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        )
+        self._client = AsyncOpenAI(
+            api_key=api_key, max_retries=0, http_client=http_client
+        )
 
         self.model = model
         self.max_tokens = max_tokens
@@ -61,15 +75,20 @@ class OpenAIClient:
         self.max_retries = 3
         self.retry_delay = 1  # seconds
 
-    def get_chat_response(
-        self, messages: List[Dict[str, str]], user_id: Optional[int] = None
+    async def get_chat_response(
+        self,
+        messages: Sequence[Dict[str, str]],
+        user_id: Optional[int] = None,
+        validate_last_only: bool = False,
     ) -> Tuple[bool, str, str]:
         """
         Get chat completion from OpenAI for Discord messages
 
         Args:
-            messages: List of message dicts [{"role": "user", "content": "..."}]
+            messages: Sequence of message dicts (list or deque) [{"role": "user", "content": "..."}]
             user_id: Optional Discord user ID for logging (will be sanitized)
+            validate_last_only: Only validate the newest message, for callers
+                that append one message per turn to an already validated history
 
         Returns:
             Tuple of (success, response_text, error_message)
@@ -81,23 +100,30 @@ class OpenAIClient:
         if not messages:
             return False, "", "No messages provided"
 
-        if not self._validate_messages(messages):
+        if not self._validate_messages(messages, last_only=validate_last_only):
             return False, "", "Invalid message format"
 
+        # Bind settings once instead of looking them up on every attempt
+        create_completion = self._client.chat.completions.create
+        model, max_tokens, temperature = self.model, self.max_tokens, self.temperature
+        max_retries, retry_delay = self.max_retries, self.retry_delay
+
         # Attempt API call with retries
-        for attempt in range(self.max_retries):
+        for attempt in range(max_retries):
             try:
-                # Make API call (v0.28.1 syntax)
-                response = openai.ChatCompletion.create(
-                    model=self.model,
+                # Make API call without blocking the event loop
+                response = await create_completion(
+                    model=model,
                     messages=messages,
-                    max_tokens=self.max_tokens,
-                    temperature=self.temperature,
-                    request_timeout=30,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=30,
                 )
 
-                # Extract response text (v0.28.1 syntax)
-                response_text = response.choices[0].message.content.strip()
+                # Extract response text
+                if not response.choices:
+                    return False, "", "Empty response from OpenAI"
+                response_text = (response.choices[0].message.content or "").strip()
 
                 # Validate response
                 if not response_text:
@@ -105,76 +131,98 @@ class OpenAIClient:
 
                 return True, response_text, ""
 
-            except Exception as e:
-                error_str = str(e).lower()
-
-                # Rate limit error
-                if "rate" in error_str or "429" in error_str:
-                    if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay * (attempt + 1))
-                        continue
-                    return False, "", "Rate limit exceeded. Please try again later."
-
-                # Invalid request
-                elif "invalid" in error_str or "400" in error_str:
+            # Rate limit error
+            except openai.RateLimitError:
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay * (attempt + 1))
+                    continue
+                return False, "", "Rate limit exceeded. Please try again later."
+
+            # Timeout
+            except openai.APITimeoutError:
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay * 2 * (attempt + 1))
+                    continue
+                return False, "", "Request timed out. Please try again."
+
+            # Authentication error
+            except openai.AuthenticationError:
+                return False, "", "Authentication failed"
+
+            # Invalid request
+            except openai.BadRequestError:
+                return False, "", "Invalid request to AI service"
+
+            # Other client errors (403, 404, 422...) - retrying won't help
+            except openai.APIStatusError as e:
+                if 400 <= e.status_code < 500:
                     return False, "", "Invalid request to AI service"
-
-                # Authentication error
-                elif "auth" in error_str or "401" in error_str:
-                    return False, "", "Authentication failed"
-
-                # Timeout
-                elif "timeout" in error_str or "timed out" in error_str:
-                    if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay * 2 * (attempt + 1))
-                        continue
-                    return False, "", "Request timed out. Please try again."
-
-                # Other errors - retry
-                else:
-                    if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay * (attempt + 1))
-                        continue
-                    return False, "", "AI service temporarily unavailable"
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay * (attempt + 1))
+                    continue
+                return False, "", "AI service temporarily unavailable"
+
+            # Other errors - retry
+            except Exception:
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay * (attempt + 1))
+                    continue
+                return False, "", "AI service temporarily unavailable"
 
         # All retries exhausted
         return False, "", "Service temporarily unavailable after multiple attempts"
 
-    def _validate_messages(self, messages: List[Dict[str, str]]) -> bool:
+    def _validate_messages(
+        self, messages: Sequence[Dict[str, str]], last_only: bool = False
+    ) -> bool:
         """
         Validate message format for OpenAI API
 
         Args:
-            messages: List of message dictionaries
+            messages: Sequence of message dictionaries
+            last_only: Only check the newest message (earlier ones were
+                validated on previous turns)
 
         Returns:
             True if format is valid
         """
-        if not isinstance(messages, list):
+        if not isinstance(messages, SequenceABC):
             return False
 
-        valid_roles = {"system", "user", "assistant"}
+        if last_only:
+            return self._validate_message(messages[-1])
+
+        return all(self._validate_message(msg) for msg in messages)
+
+    def _validate_message(self, msg: Dict[str, str]) -> bool:
+        """
+        Validate a single message dictionary
 
-        for msg in messages:
-            # Check it's a dict
-            if not isinstance(msg, dict):
-                return False
+        Args:
+            msg: Message dictionary {"role": "...", "content": "..."}
 
-            # Check required keys
-            if "role" not in msg or "content" not in msg:
-                return False
+        Returns:
+            True if format is valid
+        """
+        # Check it's a dict
+        if not isinstance(msg, dict):
+            return False
 
-            # Check role is valid
-            if msg["role"] not in valid_roles:
-                return False
+        # Check required keys
+        if "role" not in msg or "content" not in msg:
+            return False
 
-            # Check content is string
-            if not isinstance(msg["content"], str):
-                return False
+        # Check role is valid
+        if msg["role"] not in self.VALID_ROLES:
+            return False
 
-            # Check content not empty
-            if not msg["content"].strip():
-                return False
+        # Check content is string
+        if not isinstance(msg["content"], str):
+            return False
+
+        # Check content not empty
+        if not msg["content"].strip():
+            return False
 
         return True
 
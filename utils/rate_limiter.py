@@ -4,9 +4,9 @@ Prevents spam and API abuse by limiting requests per user
 Author: Sami (CodeNob Dev)
 """
 
+import math
 import time
-from collections import defaultdict, deque
-from typing import Dict, Deque
+from typing import Dict, Tuple
 
 
 class RateLimiter:
@@ -14,12 +14,15 @@ class RateLimiter:
     Simple in-memory rate limiter to prevent spam in Discord bot
 
     Tracks requests per user and enforces a maximum rate.
-    Uses a sliding window approach with timestamps.
+    Uses a token bucket approach: each user has a bucket of max_requests
+    tokens that refills continuously over time_window seconds. A user can
+    burst up to max_requests messages, then regains one every
+    time_window / max_requests seconds.
 
     Security features:
     - Per-user rate limiting
     - Configurable time window
-    - Automatic cleanup of old entries
+    - Idle entries reclaimed incrementally on each request
     - Thread-safe for single-process bots
     """
 
@@ -34,13 +37,12 @@ class RateLimiter:
         self.max_requests = max_requests
         self.time_window = time_window
 
-        # Store timestamps of requests per user
-        # Key: user_id, Value: deque of timestamps
-        self.user_requests: Dict[int, Deque[float]] = defaultdict(deque)
+        # Tokens regained per second
+        self.refill_rate = max_requests / time_window
 
-        # Track when we last cleaned up old entries
-        self.last_cleanup = time.time()
-        self.cleanup_interval = 300  # Cleanup every 5 minutes
+        # Store token bucket state per user
+        # Key: user_id, Value: (tokens, last_refill monotonic timestamp)
+        self.user_requests: Dict[int, Tuple[float, float]] = {}
 
     def is_allowed(self, user_id: int) -> bool:
         """
@@ -52,28 +54,25 @@ class RateLimiter:
         Returns:
             True if user can make request, False if rate limited
         """
-        current_time = time.time()
+        current_time = time.monotonic()
 
-        # Perform periodic cleanup
-        self._cleanup_if_needed(current_time)
+        # Take user's bucket out so it is re-inserted at the end below,
+        # keeping entries ordered by activity (one lookup per request)
+        tokens, last_refill = self.user_requests.pop(
+            user_id, (self.max_requests, current_time)
+        )
+        self._evict_oldest_if_idle(current_time)
 
-        # Get user's request history
-        user_queue = self.user_requests[user_id]
+        # Refill user's bucket for the time elapsed since last check
+        tokens = self._refill(tokens, last_refill, current_time)
 
-        # Remove requests outside the time window
-        cutoff_time = current_time - self.time_window
-        while user_queue and user_queue[0] < cutoff_time:
-            user_queue.popleft()
-
-        # Check if user has exceeded rate limit
-        current_count = len(user_queue)
-
-        if current_count < self.max_requests:
-            # User is allowed, record this request
-            user_queue.append(current_time)
+        if tokens >= 1:
+            # User is allowed, consume one token
+            self.user_requests[user_id] = (tokens - 1, current_time)
             return True
         else:
             # User has exceeded rate limit
+            self.user_requests[user_id] = (tokens, current_time)
             return False
 
     def get_wait_time(self, user_id: int) -> int:
@@ -86,17 +85,17 @@ class RateLimiter:
         Returns:
             Seconds until next request is allowed (0 if allowed now)
         """
-        user_queue = self.user_requests[user_id]
+        current_time = time.monotonic()
+        tokens, last_refill = self.user_requests.get(
+            user_id, (self.max_requests, current_time)
+        )
+        tokens = self._refill(tokens, last_refill, current_time)
 
-        if not user_queue or len(user_queue) < self.max_requests:
+        if tokens >= 1:
             return 0
 
-        # Calculate when the oldest request will expire
-        oldest_request = user_queue[0]
-        current_time = time.time()
-        wait_time = int(self.time_window - (current_time - oldest_request))
-
-        return max(0, wait_time)
+        # Calculate when the bucket will hold one full token again
+        return math.ceil((1 - tokens) / self.refill_rate)
 
     def reset_user(self, user_id: int):
         """
@@ -108,35 +107,43 @@ class RateLimiter:
         if user_id in self.user_requests:
             del self.user_requests[user_id]
 
-    def _cleanup_if_needed(self, current_time: float):
+    def _refill(self, tokens: float, last_refill: float, current_time: float) -> float:
         """
-        Clean up old user entries to prevent memory bloat
+        Get token count refilled up to current_time
 
         Args:
-            current_time: Current timestamp
+            tokens: Tokens left at last_refill
+            last_refill: Timestamp of the previous refill
+            current_time: Current monotonic timestamp
+
+        Returns:
+            Available tokens (capped at max_requests)
         """
-        # Only cleanup every cleanup_interval seconds
-        if current_time - self.last_cleanup < self.cleanup_interval:
-            return
+        return min(
+            self.max_requests,
+            tokens + (current_time - last_refill) * self.refill_rate,
+        )
 
-        # Remove users with no recent requests
-        cutoff_time = current_time - self.time_window
-        users_to_remove = []
+    def _evict_oldest_if_idle(self, current_time: float):
+        """
+        Drop the least recently active user if their bucket is full again
 
-        for user_id, queue in self.user_requests.items():
-            # Remove old timestamps from queue
-            while queue and queue[0] < cutoff_time:
-                queue.popleft()
+        Entries are kept in order of last activity, so checking one entry
+        per request is enough to reclaim idle users without a full sweep.
 
-            # If queue is empty, mark user for removal
-            if not queue:
-                users_to_remove.append(user_id)
+        Args:
+            current_time: Current monotonic timestamp
+        """
+        if not self.user_requests:
+            return
 
-        # Remove inactive users
-        for user_id in users_to_remove:
-            del self.user_requests[user_id]
+        oldest_user = next(iter(self.user_requests))
+        _, last_refill = self.user_requests[oldest_user]
 
-        self.last_cleanup = current_time
+        # After a full time window the bucket has refilled completely,
+        # which is the same state as having no entry at all
+        if current_time - last_refill >= self.time_window:
+            del self.user_requests[oldest_user]
 
     def get_stats(self) -> Dict:
         """
@@ -149,5 +156,4 @@ class RateLimiter:
             "active_users": len(self.user_requests),
             "max_requests": self.max_requests,
             "time_window_seconds": self.time_window,
-            "last_cleanup": self.last_cleanup,
         }
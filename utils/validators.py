@@ -36,6 +36,10 @@ class InputValidator:
         r"\|\|.*rm\s+-rf",  # Command injection
     ]
 
+    # Precompiled once so each message is scanned in a single regex pass
+    _DANGEROUS_RE = re.compile("|".join(DANGEROUS_PATTERNS), re.IGNORECASE)
+    _HTML_TAG_RE = re.compile(r"<[^>]+>")
+
     @staticmethod
     def validate_message(text: str) -> Tuple[bool, str, str]:
         """
@@ -66,9 +70,8 @@ class InputValidator:
             )
 
         # Check for dangerous patterns
-        for pattern in InputValidator.DANGEROUS_PATTERNS:
-            if re.search(pattern, cleaned, re.IGNORECASE):
-                return False, "", "Message contains potentially dangerous content"
+        if InputValidator._DANGEROUS_RE.search(cleaned):
+            return False, "", "Message contains potentially dangerous content"
 
         # Remove HTML tags for safety
         cleaned = InputValidator._strip_html(cleaned)
@@ -88,7 +91,7 @@ class InputValidator:
             Text with HTML tags removed
         """
         # Remove all HTML tags
-        cleaned = re.sub(r"<[^>]+>", "", text)
+        cleaned = InputValidator._HTML_TAG_RE.sub("", text)
         return cleaned
 
     @staticmethod